@@ -1,6 +1,9 @@
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 from freshbooks.services import ServicesMixin
@@ -21,6 +24,39 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
         self.business_id = business_id
         self.base_url = "https://api.freshbooks.com"
         self.dont_send = True 
+        
+        # Loaded by get_clients; None until then
+        self.clients = None
+        
+        # Shared session so repeated API calls reuse pooled keep-alive connections
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Api-Version": "alpha"
+        })
+        # Rate limits (429) and transient server errors are retried here, honoring Retry-After
+        retries = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True
+        )
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=retries))
+        # Time entries are POSTed concurrently, so also retry those when rate limited: a 429 means
+        # the entry wasn't created, while read errors are not retried so nothing is created twice
+        post_retries = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429],
+            allowed_methods=["POST"],
+            respect_retry_after_header=True,
+            read=False,
+            raise_on_status=False
+        )
+        self.session.mount(f"{self.base_url}/timetracking/",
+                           HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=post_retries))
     
         # If business_id not provided, load it
         if not self.business_id:
@@ -36,7 +72,7 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
         # Logic to create an invoice in Freshbooks
         pass
 
-    def create_time_entry(self, time_entry):
+    def create_time_entry(self, time_entry, default_started_at=None, resolved_ids=None):
         """
         Create a time entry in Freshbooks based on data from CSV/Excel.
         
@@ -49,6 +85,11 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
                 - tags/service: Optional service identifier or tags
                 - folderid: Can be used to map to project_id
                 - activity: Activity name which can be used to find client
+            default_started_at: Optional ISO 8601 UTC timestamp used when the entry
+                has no startdate (lets batch callers compute "now" once)
+            resolved_ids: Optional (client_id, service_id) tuple from _resolve_time_entry_ids.
+                When given, no lookups are done here and the identity ID must already be
+                resolved, so batch workers don't touch the shared lookup caches
                 
         Returns:
             Response from Freshbooks API or None if the request failed
@@ -91,9 +132,11 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
                 elif isinstance(started_at, str) and 'T' in started_at and 'Z' not in started_at:
                     started_at = f"{started_at}Z"
                     
+            elif default_started_at:
+                started_at = default_started_at
             else:
                 # Use current time in UTC
-                started_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+                started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
             # Better handling of billable flag
             billable = False  # Default to False
             if 'billable' in time_entry:
@@ -115,44 +158,20 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
                 }
             }
                             
-            # Add client_id by looking up the client name from activityName or activity
-            client_name = None
-            if 'activityname' in time_entry and time_entry['activityname']:
-                client_name = time_entry['activityname']
-            elif 'activity' in time_entry and time_entry['activity']:
-                client_name = time_entry['activity']
+            # Add the client and service IDs, looking them up unless the caller already did
+            if resolved_ids is None:
+                client_id, service_id = self._resolve_time_entry_ids(time_entry)
                 
-            if client_name:
-                client_id = self.get_client_id_from_name(client_name)
-                if client_id:
-                    freshbooks_entry["time_entry"]["client_id"] = str(client_id)
-                    logging.info(f"Matched client name '{client_name}' to client ID: {client_id}")
-            
-            # Add optional fields if they exist in the input
-            # Map client ID if explicitly provided
-            if 'client_id' in time_entry:
-                freshbooks_entry["time_entry"]["client_id"] = str(time_entry['client_id'])
-            # Try to match service from tags if available
-            service_id = self.extract_service_from_time_entry(time_entry)
-            if service_id:
-                freshbooks_entry["time_entry"]["service_id"] = str(service_id)
-                logging.info(f"Matched service tag to service ID: {service_id}")
-            # Map service ID if explicitly provided as 'service'
-            elif 'service' in time_entry and time_entry['service']:
-                # Check if it's a direct ID or needs to be looked up
-                if isinstance(time_entry['service'], (int, str)) and str(time_entry['service']).isdigit():
-                    # It's already an ID
-                    freshbooks_entry["time_entry"]["service_id"] = str(time_entry['service'])
-                else:
-                    # Try to look it up by name
-                    service_id = self.get_service_id_from_tag(time_entry['service'])
-                    if service_id:
-                        freshbooks_entry["time_entry"]["service_id"] = str(service_id)
-                        logging.info(f"Matched service name '{time_entry['service']}' to service ID: {service_id}")
+                # Ensure we have the identity ID (user ID)
+                if not hasattr(self, 'identity_id'):
+                    self.get_identity_id()
+            else:
+                client_id, service_id = resolved_ids
             
-            # Ensure we have the identity ID (user ID)
-            if not hasattr(self, 'identity_id'):
-                self.get_identity_id()
+            if client_id is not None:
+                freshbooks_entry["time_entry"]["client_id"] = client_id
+            if service_id is not None:
+                freshbooks_entry["time_entry"]["service_id"] = service_id
             
             # Add identity_id to the request
             if hasattr(self, 'identity_id') and self.identity_id:
@@ -160,13 +179,6 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
             elif 'identity_id' in time_entry:  # Fallback to provided identity_id if available
                 freshbooks_entry["time_entry"]["identity_id"] = str(time_entry['identity_id'])
             
-            # Set headers
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "Api-Version": "alpha"
-            }
-
             # Send the request
             if self.dont_send:
                 logging.info("Would have sent the following time entry data:")
@@ -181,7 +193,8 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
                     "fuzzy_matches": []  # Empty array to maintain structure
                 }
             else:
-                response = requests.post(endpoint, json=freshbooks_entry, headers=headers)
+                # Only a 429 is retried for POSTs, so a failed entry is never created twice
+                response = self.session.post(endpoint, json=freshbooks_entry, timeout=30)
                         
             if response.status_code == 200 or response.status_code == 201:
                 return response.json()
@@ -195,6 +208,56 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
             logging.error(f"Time entry data: {time_entry}")
             return None
             
+    def _resolve_time_entry_ids(self, time_entry):
+        """
+        Look up the Freshbooks client and service IDs for a time entry.
+        
+        Args:
+            time_entry: Dict in the format accepted by create_time_entry
+            
+        Returns:
+            Tuple of (client_id, service_id) as strings, None for each one not found
+        """
+        client_id = None
+        service_id = None
+        
+        # Add client_id by looking up the client name from activityName or activity
+        client_name = None
+        if 'activityname' in time_entry and time_entry['activityname']:
+            client_name = time_entry['activityname']
+        elif 'activity' in time_entry and time_entry['activity']:
+            client_name = time_entry['activity']
+            
+        if client_name:
+            matched_client_id = self.get_client_id_from_name(client_name)
+            if matched_client_id:
+                client_id = str(matched_client_id)
+                logging.info(f"Matched client name '{client_name}' to client ID: {matched_client_id}")
+        
+        # Add optional fields if they exist in the input
+        # Map client ID if explicitly provided
+        if 'client_id' in time_entry:
+            client_id = str(time_entry['client_id'])
+        # Try to match service from tags if available
+        matched_service_id = self.extract_service_from_time_entry(time_entry)
+        if matched_service_id:
+            service_id = str(matched_service_id)
+            logging.info(f"Matched service tag to service ID: {matched_service_id}")
+        # Map service ID if explicitly provided as 'service'
+        elif 'service' in time_entry and time_entry['service']:
+            # Check if it's a direct ID or needs to be looked up
+            if isinstance(time_entry['service'], (int, str)) and str(time_entry['service']).isdigit():
+                # It's already an ID
+                service_id = str(time_entry['service'])
+            else:
+                # Try to look it up by name
+                matched_service_id = self.get_service_id_from_tag(time_entry['service'])
+                if matched_service_id:
+                    service_id = str(matched_service_id)
+                    logging.info(f"Matched service name '{time_entry['service']}' to service ID: {matched_service_id}")
+        
+        return client_id, service_id
+
     def create_time_entries_batch(self, time_entries):
         """
         Create multiple time entries from a list.
@@ -216,7 +279,13 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
         if not hasattr(self, 'services'):
             self.get_services()
         
-        # Process each entry
+        # Entries without a start date are all logged "now", so compute it once
+        now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        
+        # Match every entry and resolve its client and service IDs first; the lookups fill shared
+        # caches, so they stay on this thread and the workers below only build and send requests
+        entry_fuzzy_info = []
+        entry_resolved_ids = []
         for entry in time_entries:
             # Track fuzzy matches for this entry
             fuzzy_info = {
@@ -232,7 +301,7 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
                 client_name = entry['activity']
                 
             if client_name:
-                client = self.find_client_by_name(client_name)
+                client, match_score = self.find_client_by_name(client_name, return_score=True)
                 
                 if client:
                     # Determine if it was an exact or fuzzy match
@@ -242,7 +311,7 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
                         score = 1.0
                     else:
                         match_type = "fuzzy"
-                        score = self._calculate_fuzzy_match_score(client_name, client)
+                        score = match_score
                         
                         # Add to fuzzy matches collection if not an exact match
                         if match_type == "fuzzy" and score < 1.0:
@@ -268,9 +337,40 @@ class FreshbooksClient(ServicesMixin, ClientsMixin, FuzzyMatchingMixin):
                 fuzzy_matches["services"].append(service_info)
                 fuzzy_info["service"] = service_info
             
-            # Create the time entry
-            result = self.create_time_entry(entry)
+            entry_fuzzy_info.append(fuzzy_info)
             
+            try:
+                entry_resolved_ids.append(self._resolve_time_entry_ids(entry))
+            except Exception as e:
+                # The entry fails on its own, as it would have inside create_time_entry
+                logging.error(f"Error creating time entry: {str(e)}")
+                logging.error(f"Time entry data: {entry}")
+                entry_resolved_ids.append(None)
+        
+        # Resolve the identity once up front instead of racing to look it up from every worker
+        identity_error = None
+        if time_entries and not hasattr(self, 'identity_id'):
+            try:
+                self.get_identity_id()
+            except Exception as e:
+                identity_error = e
+        
+        def submit(entry, resolved_ids):
+            if resolved_ids is None:
+                return None
+            if identity_error is not None:
+                # Each entry fails on its own, as it would have looking the identity up itself
+                logging.error(f"Error creating time entry: {str(identity_error)}")
+                logging.error(f"Time entry data: {entry}")
+                return None
+            return self.create_time_entry(entry, default_started_at=now_iso, resolved_ids=resolved_ids)
+        
+        # Each POST is independent and network bound, so send them concurrently over the shared
+        # session; map keeps the results in entry order
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(submit, time_entries, entry_resolved_ids))
+        
+        for entry, fuzzy_info, result in zip(time_entries, entry_fuzzy_info, results):
             if result:
                 successful.append({
                     "original": entry,
@@ -1,5 +1,45 @@
-import requests
+import os
+import json
+import tempfile
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from freshbooks.utils import json_loads
+
+# Words that don't help when scoring a name against a client
+_CLIENT_STOP_WORDS = frozenset({'llc', 'inc', 'ltd', 'corp', 'corporation', 'company', 'co'})
+
+# Bump when the layout of the on-disk client cache changes so stale caches are ignored
+_CLIENTS_CACHE_VERSION = 3
+
+
+def _get_client_comparison_text(client, key):
+    """Extract the text used to fuzzy match a client under a by_name key."""
+    fname = client.get('fname') or ''
+    lname = client.get('lname') or ''
+    full_name = (fname + ' ' + lname).strip() if fname or lname else ''
+    organization = client.get('organization') or ''
+    # Return the combination of all text fields
+    return f"{full_name} {organization} {key}".strip()
+
+
+def _tokenize_client(client):
+    """
+    Pre-compute the lowercased names a client is looked up by.
+    
+    Args:
+        client: Client dict from the Freshbooks API
+    
+    Returns:
+        Tuple of (full_name, organization), both lowercased and possibly empty
+    """
+    fname = client.get('fname') or ''
+    lname = client.get('lname') or ''
+    full_name = (fname + ' ' + lname).strip().lower() if fname or lname else ''
+    organization = (client.get('organization') or '').lower()
+    return full_name, organization
+
 
 class ClientsMixin:
     """
@@ -7,144 +47,288 @@ class ClientsMixin:
     This separates the client-related code from the main client code.
     """
     
-    def get_clients(self):
+    # Processed client lookups are cached on disk per account; set the directory to None to disable
+    clients_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "freshbooks")
+    clients_cache_ttl = 6 * 60 * 60  # Seconds
+    
+    def get_clients(self, refresh=False):
         """
         Retrieve all clients from Freshbooks API and store them in self.clients.
+        A recent on-disk copy for the same account is used instead unless refresh=True.
+        
+        Args:
+            refresh: If True, ignore the on-disk cache and fetch the clients from the API
         
         Returns:
             Dict containing all clients if successful, None otherwise
+            (self.clients is then left with empty lookups)
         """
         endpoint = f"{self.base_url}/accounting/account/{self.account_id}/users/clients"
         
+        # Cached name lookups are only valid for the client list they were made against
+        self._reset_fuzzy_cache("client")
+        
+        if not refresh:
+            cached_clients = self._load_clients_cache()
+            if cached_clients is not None:
+                try:
+                    clients = self._new_clients_lookup()
+                    self._add_clients_to_lookup(clients, cached_clients)
+                    self._prepare_client_targets(clients)
+                    self.clients = clients
+                    return self.clients
+                except Exception as e:
+                    # Fall through to the API rather than fail on a damaged cache
+                    logging.warning(f"Ignoring unusable client cache: {str(e)}")
+        
         try:
-            clients = []
-            page = 1
-            more_pages = True
+            # Create a client lookup by both ID and name, filled in as each page arrives
+            clients = self._new_clients_lookup()
             
-            # Set headers
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "Api-Version": "alpha"
-            }
+            # Fetch the first page to learn how many pages there are
+            first_page = self._get_clients_page(endpoint, 1)
             
-            # Paginate through all clients
-            while more_pages:
-                params = {
-                    "page": page,
-                    "per_page": 100  # Maximum allowed by API
-                }
-                
-                response = requests.get(endpoint, headers=headers, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Add clients from current page
-                    if 'response' in data and 'result' in data['response'] and 'clients' in data['response']['result']:
-                        page_clients = data['response']['result']['clients']
-                        clients.extend(page_clients)
-                        
-                        # Check if there are more pages
-                        current_page = data['response']['result']['page']
-                        total_pages = data['response']['result']['pages']
-                        
-                        if current_page >= total_pages:
-                            more_pages = False
-                        else:
-                            page += 1
-                    else:
-                        logging.error(f"Unexpected response format: {data}")
-                        more_pages = False
-                else:
-                    logging.error(f"Failed to retrieve clients. Status code: {response.status_code}")
-                    logging.error(f"Response: {response.text}")
-                    more_pages = False
-            
-            # Create a client lookup by both ID and name
-            self.clients = {
-                "by_id": {},
-                "by_name": {},
-                "all": clients
-            }
+            # Only a client list with every page in it is saved for later runs
+            complete = first_page is not None
             
-            # Populate lookups
-            for client in clients:
-                client_id = client.get('id')
-                if client_id:
-                    self.clients["by_id"][client_id] = client
+            if first_page is not None:
+                self._add_clients_to_lookup(clients, first_page['clients'])
+                total_pages = first_page['pages']
                 
-                # Create name lookup using full name and organization
-                full_name = f"{client.get('fname', '')} {client.get('lname', '')}".strip()
-                organization = client.get('organization', '')
-                
-                if full_name:
-                    self.clients["by_name"][full_name.lower()] = client
-                
-                if organization:
-                    self.clients["by_name"][organization.lower()] = client
-                
-                # Also add combined name and organization for more precise matching
-                if full_name and organization:
-                    combined = f"{full_name} - {organization}"
-                    self.clients["by_name"][combined.lower()] = client
+                # Fetch the remaining pages concurrently over the pooled session
+                if total_pages > 1:
+                    with ThreadPoolExecutor(max_workers=8) as executor:
+                        pages = executor.map(lambda page: self._get_clients_page(endpoint, page),
+                                             range(2, total_pages + 1))
+                        for result in pages:
+                            # Stop at the first malformed page, like the serial loop did
+                            if result is None:
+                                complete = False
+                                break
+                            self._add_clients_to_lookup(clients, result['clients'])
+            
+            self._prepare_client_targets(clients)
             
+            self.clients = clients
+            if complete:
+                self._save_clients_cache(clients["all"])
+            else:
+                logging.warning("Client list is incomplete, not saving it to the client cache")
             return self.clients
         
         except Exception as e:
             logging.error(f"Error retrieving clients: {str(e)}")
+            
+            # Leave empty lookups behind so name lookups find no match instead of failing
+            clients = self._new_clients_lookup()
+            self._prepare_client_targets(clients)
+            self.clients = clients
+            return None
+
+    def _new_clients_lookup(self):
+        """
+        Create empty client lookups in the format of self.clients.
+        
+        Returns:
+            Dict with empty by_id, by_name and all entries
+        """
+        return {
+            "by_id": {},
+            "by_name": {},
+            "all": []
+        }
+
+    def _prepare_client_targets(self, clients):
+        """
+        Tokenize and index the fuzzy targets once here instead of on every fuzzy lookup.
+        
+        Args:
+            clients: Client lookups built by get_clients
+        """
+        clients["fuzzy_targets"] = self._prepare_fuzzy_targets(
+            clients["by_name"],
+            _get_client_comparison_text,
+            custom_stop_words=_CLIENT_STOP_WORDS
+        )
+
+    def _get_clients_cache_path(self):
+        """
+        Get the path of the on-disk client cache for this account.
+        
+        Returns:
+            Cache file path, or None if caching is disabled
+        """
+        if not self.clients_cache_dir:
             return None
+        return os.path.join(self.clients_cache_dir, f"{self.account_id}.v{_CLIENTS_CACHE_VERSION}.json")
 
-    def find_client_by_name(self, name):
+    def _load_clients_cache(self):
+        """
+        Load the client list saved by a previous run, if still fresh.
+        
+        Returns:
+            List of client dicts from the Freshbooks API, or None if there is no usable cache
+        """
+        cache_path = self._get_clients_cache_path()
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+        
+        if time.time() - os.path.getmtime(cache_path) > self.clients_cache_ttl:
+            return None
+        
+        try:
+            # Plain JSON, so a file in the shared cache directory can't run code when loaded
+            with open(cache_path, 'rb') as f:
+                clients = json_loads(f.read())
+            if not isinstance(clients, list) or not all(isinstance(client, dict) for client in clients):
+                raise ValueError("expected a list of client objects")
+            logging.info(f"Loaded {len(clients)} clients from cache {cache_path}")
+            return clients
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable client cache {cache_path}: {str(e)}")
+            return None
+
+    def _save_clients_cache(self, clients):
+        """
+        Save the client list so later runs can skip the API round-trips.
+        
+        Args:
+            clients: List of client dicts from the Freshbooks API
+        """
+        cache_path = self._get_clients_cache_path()
+        if not cache_path:
+            return
+        
+        try:
+            os.makedirs(self.clients_cache_dir, exist_ok=True)
+            
+            # Write to a temporary file first so readers never see a partial cache
+            fd, temp_path = tempfile.mkstemp(dir=self.clients_cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(clients, f)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logging.warning(f"Could not write client cache {cache_path}: {str(e)}")
+
+    def _add_clients_to_lookup(self, clients, page_clients):
+        """
+        Add a page of clients to the client lookups in a single pass.
+        
+        Args:
+            clients: Lookup dict being built by get_clients
+            page_clients: List of client dicts from one page of the API response
+        """
+        by_id = clients["by_id"]
+        by_name = clients["by_name"]
+        
+        for client in page_clients:
+            clients["all"].append(client)
+            
+            # Lowercase each client's names once, then reuse them for every key
+            full_name, organization = _tokenize_client(client)
+            
+            client_id = client.get('id')
+            if client_id:
+                by_id[client_id] = client
+            
+            # Create name lookup using full name and organization
+            if full_name:
+                by_name[full_name] = client
+            
+            if organization:
+                by_name[organization] = client
+            
+            # Also add combined name and organization for more precise matching
+            if full_name and organization:
+                by_name[full_name + " - " + organization] = client
+
+    def _get_clients_page(self, endpoint, page):
+        """
+        Retrieve a single page of clients from Freshbooks API.
+        
+        Args:
+            endpoint: Clients endpoint URL
+            page: Page number to fetch
+        
+        Returns:
+            The 'result' dict of the response (clients, page, pages), None if the payload is malformed
+        
+        Raises:
+            requests.HTTPError: If the page could not be retrieved after retries
+        """
+        params = {
+            "page": page,
+            "per_page": 100  # Maximum allowed by API
+        }
+        
+        # The shared session already carries the auth headers and retries transient failures,
+        # so any error status left here means the client list can't be loaded completely
+        response = self.session.get(endpoint, params=params, timeout=30)
+        response.raise_for_status()
+        
+        # Decode the raw bytes directly instead of going through response.json()
+        data = json_loads(response.content)
+        
+        if 'response' in data and 'result' in data['response'] and 'clients' in data['response']['result']:
+            return data['response']['result']
+        
+        logging.error(f"Unexpected response format: {data}")
+        return None
+
+    def find_client_by_name(self, name, return_score=False):
         """
         Find a client by name or organization.
         
         Args:
             name: String with client name or organization to search for
+            return_score: If True, also return the match score (1.0 for exact matches)
         
         Returns:
-            Client dict if found, None otherwise
+            Client dict if found, None otherwise.
+            With return_score=True, a (client, score) tuple instead, (None, 0.0) if not found.
         """
-        if not hasattr(self, 'clients'):
+        if self.clients is None:
             self.get_clients()
         
-        # Try exact match first
+        # Repeated names (e.g. the same activity on many entries) are answered from the cache
         name_lower = name.lower()
-        if name_lower in self.clients["by_name"]:
-            return self.clients["by_name"][name_lower]
-        
-        # Try partial match if exact match fails
-        client_of_best_match = self.partial_match_client(name)
-        if client_of_best_match is not None:
-            return client_of_best_match
+        cache_key = ("client", name_lower)
+        cached = self._fuzzy_cache.get(cache_key)
+        if cached is None:
+            # Try exact match first, then partial match if exact match fails
+            client = self.clients["by_name"].get(name_lower)
+            if client is not None:
+                cached = (client, 1.0)
+            else:
+                cached = self.partial_match_client(name, return_score=True)
+            
+            # Cache misses too, so unmatched names aren't fuzzy matched again
+            self._fuzzy_cache[cache_key] = cached
         
-        return None
+        return cached if return_score else cached[0]
 
-    def partial_match_client(self, name):
+    def partial_match_client(self, name, return_score=False):
         """
         Find a client by partial name or organization.
         
         Args:
             name: String with partial client name or organization to search for
+            return_score: If True, also return the fuzzy match score
         
         Returns:
-            Client dict if found, None otherwise
+            Client dict if found, None otherwise.
+            With return_score=True, a (client, score) tuple instead, (None, 0.0) if not found.
         """
-        # Define a function to extract comparison text from a client
-        def get_client_comparison_text(client, key):
-            full_name = f"{client.get('fname', '')} {client.get('lname', '')}".strip()
-            organization = client.get('organization', '')
-            # Return the combination of all text fields
-            return f"{full_name} {organization} {key}".strip()
-        
         # Use the shared fuzzy matching function with client-specific settings
-        client_stop_words = {'llc', 'inc', 'ltd', 'corp', 'corporation', 'company', 'co'}
         return self._fuzzy_match(
             name, 
             self.clients["by_name"], 
-            get_client_comparison_text,
+            _get_client_comparison_text,
             min_threshold=0.4,
-            custom_stop_words=client_stop_words
+            custom_stop_words=_CLIENT_STOP_WORDS,
+            prepared_targets=self.clients.get("fuzzy_targets"),
+            return_score=return_score,
+            entity_type="client"
         )
 
     def find_client_by_id(self, client_id):
@@ -157,7 +341,7 @@ class ClientsMixin:
         Returns:
             Client dict if found, None otherwise
         """
-        if not hasattr(self, 'clients'):
+        if self.clients is None:
             self.get_clients()
         
         return self.clients["by_id"].get(client_id)
@@ -177,71 +361,6 @@ class ClientsMixin:
             return client.get('id')
         return None
 
-    def _calculate_fuzzy_match_score(self, name, client):
-        """
-        Calculate the fuzzy match score between a name and a client.
-        This replicates the logic from partial_match_client for consistency.
-        
-        Args:
-            name: String with client name to match
-            client: Client dict to match against
-            
-        Returns:
-            Fuzzy match score between 0 and 1
-        """
-        # Tokenize the input name
-        input_tokens = set(name.lower().replace('-', ' ').replace('/', ' ').split())
-        
-        # Remove common words that don't help with matching
-        stop_words = {'and', 'the', 'llc', 'inc', 'ltd', 'corp', 'corporation', 'company', 'co'}
-        input_tokens = {token for token in input_tokens if token not in stop_words}
-        
-        # Generate the client name key like in partial_match_client
-        full_name = f"{client.get('fname', '')} {client.get('lname', '')}".strip().lower()
-        organization = client.get('organization', '').lower()
-        
-        # Tokenize the client name and organization
-        client_tokens = set(full_name.replace('-', ' ').replace('/', ' ').split())
-        if organization:
-            client_tokens.update(organization.replace('-', ' ').replace('/', ' ').split())
-        
-        client_tokens = {token for token in client_tokens if token not in stop_words}
-        
-        # Calculate scores
-        if len(input_tokens) == 0 or len(client_tokens) == 0:
-            return 0.0
-            
-        # Overlap coefficient
-        overlap = len(input_tokens.intersection(client_tokens))
-        overlap_score = overlap / min(len(input_tokens), len(client_tokens))
-        
-        # Substring matches
-        substring_score = 0
-        for token in input_tokens:
-            if token in full_name:
-                substring_score += 0.5
-            if token in organization:
-                substring_score += 0.5
-        
-        substring_score = min(1.0, substring_score / len(input_tokens)) if input_tokens else 0
-        
-        # Initial matches
-        initial_score = 0
-        if client.get('fname') and client.get('lname'):
-            initials = (client.get('fname', '')[0] + client.get('lname', '')[0]).lower()
-            for token in input_tokens:
-                if len(token) == 2 and token.lower() == initials:
-                    initial_score = 0.8
-        
-        # Combined score
-        combined_score = (overlap_score * 0.6) + (substring_score * 0.3) + (initial_score * 0.1)
-        
-        # Boost for complete containment
-        if name.lower() in full_name or name.lower() in organization or full_name in name.lower() or organization in name.lower():
-            combined_score += 0.2
-        
-        return min(1.0, combined_score)  # Ensure score doesn't exceed 1.0
-        
     def export_client_mappings(self, timeular_activities, filename="client_mappings.csv"):
         """
         Export a CSV file showing the mappings between Timeular activities and Freshbooks clients.
@@ -261,42 +380,50 @@ class ClientsMixin:
         from datetime import datetime
         
         # Make sure we have clients loaded
-        if not hasattr(self, 'clients'):
+        if self.clients is None:
             self.get_clients()
         
-        # Prepare the data for CSV
-        mappings = []
+        fieldnames = ('timeular_activity', 'freshbooks_client_name', 'freshbooks_organization',
+                      'freshbooks_client_id', 'match_type', 'score')
+        
+        by_name = self.clients["by_name"]
+        
+        # Prepare the data for CSV as plain row tuples
+        rows = []
+        resolved = {}
         for activity in timeular_activities:
             # Skip empty activity names
             if not activity:
                 continue
-                
-            # Try to find a matching client
-            client = self.find_client_by_name(activity)
             
-            # Determine match type
-            if client:
-                name_lower = activity.lower()
-                if name_lower in self.clients["by_name"]:
+            # Repeated activities reuse the row built for their first occurrence
+            row = resolved.get(activity)
+            if row is None:
+                # Exact matches are answered straight from the lookup, only the rest get fuzzy matched
+                client = by_name.get(activity.lower())
+                if client is not None:
                     match_type = "Exact match"
                     score = "1.0"
                 else:
+                    client, match_score = self.find_client_by_name(activity, return_score=True)
                     match_type = "Fuzzy match"
-                    # Try to recalculate the fuzzy match score
-                    fuzzy_score = self._calculate_fuzzy_match_score(activity, client)
-                    score = f"{fuzzy_score:.2f}"
-            else:
-                match_type = "No match"
-                score = "0.0"
+                    score = f"{match_score:.2f}"
+                
+                if client:
+                    row = (
+                        activity,
+                        f"{client.get('fname', '')} {client.get('lname', '')}",
+                        client.get('organization', ''),
+                        client.get('id', ''),
+                        match_type,
+                        score
+                    )
+                else:
+                    row = (activity, "No match", "N/A", "N/A", "No match", "0.0")
+                
+                resolved[activity] = row
             
-            mappings.append({
-                'timeular_activity': activity,
-                'freshbooks_client_name': f"{client.get('fname', '')} {client.get('lname', '')}" if client else "No match",
-                'freshbooks_organization': client.get('organization', '') if client else "N/A",
-                'freshbooks_client_id': client.get('id', '') if client else "N/A",
-                'match_type': match_type,
-                'score': score
-            })
+            rows.append(row)
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -304,18 +431,17 @@ class ClientsMixin:
         
         # Write to CSV
         try:
-            with open(filename_with_timestamp, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['timeular_activity', 'freshbooks_client_name', 'freshbooks_organization', 
-                             'freshbooks_client_id', 'match_type', 'score']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for mapping in mappings:
-                    writer.writerow(mapping)
+            with open(filename_with_timestamp, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+                writer.writerows(rows)
             
             logging.info(f"Successfully exported client mappings to {filename_with_timestamp}")
-            return filename_with_timestamp, mappings
         
         except Exception as e:
             logging.error(f"Error exporting client mappings: {str(e)}")
-            return None, mappings
\ No newline at end of file
+            filename_with_timestamp = None
+        
+        # Callers still get the mappings keyed by column name
+        mappings = [dict(zip(fieldnames, row)) for row in rows]
+        return filename_with_timestamp, mappings
\ No newline at end of file
@@ -1,13 +1,16 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass(slots=True, frozen=True)
 class Invoice:
-    def __init__(self, invoice_id, client_id, amount, status, created_at):
-        self.invoice_id = invoice_id
-        self.client_id = client_id
-        self.amount = amount
-        self.status = status
-        self.created_at = created_at
+    invoice_id: int
+    client_id: int
+    amount: float
+    status: str
+    created_at: datetime
 
+@dataclass(slots=True, frozen=True)
 class Client:
-    def __init__(self, client_id, name, email):
-        self.client_id = client_id
-        self.name = name
-        self.email = email
\ No newline at end of file
+    client_id: int
+    name: str
+    email: str
\ No newline at end of file
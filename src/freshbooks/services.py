@@ -1,6 +1,53 @@
-import requests
 import logging
 
+from freshbooks.utils import json_loads
+
+# Words that don't help when matching a tag against a service
+_SERVICE_STOP_WORDS = frozenset({'service', 'services', 'consulting', 'time', 'hours', 'work'})
+
+# CSV/Excel fields that may hold service tags, in order of preference
+_TAG_FIELDS = ('tags', 'tag', 'servicetag', 'service_tag', 'service')
+
+
+def _is_timeular_api_entry(time_entry):
+    """Check whether a time entry comes from the Timeular API (tags as a list of objects)."""
+    tags = time_entry.get('tags')
+    return isinstance(tags, list) and bool(tags) and isinstance(tags[0], dict)
+
+
+def _parse_tag_list(tags):
+    """
+    Split a CSV/Excel tags value into individual tags.
+    
+    Args:
+        tags: Tags field value, either a delimited string or an iterable of tags
+    
+    Returns:
+        List of tags
+    """
+    # If tags is a string, try to parse it as a list
+    if isinstance(tags, str):
+        # Common formats: comma-separated, semicolon-separated, or space-separated
+        if ',' in tags:
+            return [t.strip() for t in tags.split(',')]
+        if ';' in tags:
+            return [t.strip() for t in tags.split(';')]
+        # Assume space-separated or single tag
+        return [tags.strip()]
+    
+    # If it's already a list or other iterable
+    try:
+        return list(tags)
+    except TypeError:
+        return [str(tags)]
+
+
+def _get_service_comparison_text(service, key):
+    """Extract the text used to fuzzy match a service under a by_name key."""
+    # For services, the name is the primary field
+    return f"{service.get('name', '')} {key}".strip()
+
+
 class ServicesMixin:
     """
     Mixin class for FreshbooksClient that handles service-related functionality.
@@ -16,19 +63,16 @@ class ServicesMixin:
         """
         endpoint = f"{self.base_url}/comments/business/{self.business_id}/services"
         
+        # Tags resolved against the previous service list may no longer be valid
+        self._reset_fuzzy_cache("service")
+        
         try:
-            # Set headers
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "Api-Version": "alpha"
-            }
-            
-            # Make the request
-            response = requests.get(endpoint, headers=headers)
+            # Make the request on the shared session, which already carries the auth headers
+            # and keeps the connection alive between calls
+            response = self.session.get(endpoint, timeout=30)
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 
                 # Check if we got services data in expected format
                 if 'services' in data:
@@ -52,7 +96,14 @@ class ServicesMixin:
                         if service_name:
                             self.services["by_name"][service_name.lower()] = service
                     
-                    logging.info(f"Retrieved {len(services)} services from Freshbooks")
+                    # Tokenize the fuzzy targets once here instead of on every tag lookup
+                    self.services["fuzzy_targets"] = self._prepare_fuzzy_targets(
+                        self.services["by_name"],
+                        _get_service_comparison_text,
+                        custom_stop_words=_SERVICE_STOP_WORDS
+                    )
+                    
+                    logging.info("Retrieved %d services from Freshbooks", len(services))
                     return self.services
                 else:
                     logging.error(f"Unexpected response format: {data}")
@@ -66,15 +117,17 @@ class ServicesMixin:
             logging.error(f"Error retrieving services: {str(e)}")
             return None
 
-    def find_service_by_tag(self, tag):
+    def find_service_by_tag(self, tag, return_score=False):
         """
         Find a service by tag name (fuzzy matching).
         
         Args:
             tag: String with tag name to search for
+            return_score: If True, also return the match score (1.0 for exact matches)
         
         Returns:
-            Service dict if found, None otherwise
+            Service dict if found, None otherwise.
+            With return_score=True, a (service, score) tuple instead, (None, 0.0) if not found.
         """
         if not hasattr(self, 'services'):
             self.get_services()
@@ -82,16 +135,20 @@ class ServicesMixin:
         # Normalize tag
         tag_lower = tag.lower().strip()
         
-        # Try exact match first
-        if tag_lower in self.services["by_name"]:
-            return self.services["by_name"][tag_lower]
-        
-        # Try fuzzy match if exact match fails
-        service_match = self._partial_match_service(tag_lower)
-        if service_match:
-            return service_match
+        # The same tag shows up on many entries, so remember each answer (misses included)
+        cache_key = ("service", tag_lower)
+        cached = self._fuzzy_cache.get(cache_key)
+        if cached is None:
+            # Try exact match first, then fuzzy match if exact match fails
+            service = self.services["by_name"].get(tag_lower)
+            if service is not None:
+                cached = (service, 1.0)
+            else:
+                cached = self._partial_match_service(tag_lower, return_score=True)
+            
+            self._fuzzy_cache[cache_key] = cached
         
-        return None
+        return cached if return_score else cached[0]
 
     def get_service_id_from_tag(self, tag):
         """
@@ -108,89 +165,30 @@ class ServicesMixin:
             return service.get('id')
         return None
         
-    def _partial_match_service(self, tag):
+    def _partial_match_service(self, tag, return_score=False):
         """
         Find a service by partial name (fuzzy matching).
         
         Args:
             tag: String with partial service name to search for
+            return_score: If True, also return the match score
         
         Returns:
-            Service dict if found, None otherwise
+            Service dict if found, None otherwise.
+            With return_score=True, a (service, score) tuple instead, (None, 0.0) if not found.
         """
-        # Define a function to extract comparison text from a service
-        def get_service_comparison_text(service, key):
-            # For services, the name is the primary field
-            return f"{service.get('name', '')} {key}".strip()
-        
         # Use the shared fuzzy matching function with service-specific settings
-        service_stop_words = {'service', 'services', 'consulting', 'time', 'hours', 'work'}
         return self._fuzzy_match(
             tag, 
             self.services["by_name"],
-            get_service_comparison_text,
+            _get_service_comparison_text,
             min_threshold=0.35,
-            custom_stop_words=service_stop_words
+            custom_stop_words=_SERVICE_STOP_WORDS,
+            prepared_targets=self.services.get("fuzzy_targets"),
+            return_score=return_score,
+            entity_type="service"
         )
         
-    def _calculate_service_match_score(self, tag, service):
-        """
-        Calculate the fuzzy match score between a tag and a service.
-        
-        Args:
-            tag: String with tag to match
-            service: Service dict to match against
-            
-        Returns:
-            Fuzzy match score between 0 and 1
-        """
-        # Get service comparison text
-        def get_service_comparison_text(service, key):
-            # For services, the name is the primary field
-            return f"{service.get('name', '')} {key}".strip()
-        
-        # Tokenize the input tag
-        input_tokens = set(tag.lower().replace('-', ' ').replace('/', ' ').split())
-        
-        # Remove common words
-        stop_words = {'and', 'the', 'of', 'in', 'for', 'to', 'with', 'by', 'at', 'from',
-                      'service', 'services', 'consulting', 'time', 'hours', 'work'}
-        input_tokens = {token for token in input_tokens if token not in stop_words and len(token) > 1}
-        
-        # Get comparison text
-        comparison_text = get_service_comparison_text(service, service.get('name', ''))
-        
-        # Tokenize the comparison text
-        target_tokens = set(comparison_text.lower().replace('-', ' ').replace('/', ' ').split())
-        target_tokens = {token for token in target_tokens if token not in stop_words and len(token) > 1}
-        
-        # Skip if either token set is empty after filtering
-        if not input_tokens or not target_tokens:
-            return 0.0
-        
-        # Calculate scores
-        # Overlap coefficient
-        overlap = len(input_tokens.intersection(target_tokens))
-        overlap_score = overlap / min(len(input_tokens), len(target_tokens))
-        
-        # Substring matches
-        substring_score = 0
-        for token in input_tokens:
-            if token in comparison_text.lower():
-                substring_score += 0.5
-        
-        substring_score = min(1.0, substring_score / len(input_tokens)) if input_tokens else 0
-        
-        # Containment check
-        containment_score = 0
-        if tag.lower() in comparison_text.lower() or comparison_text.lower() in tag.lower():
-            containment_score = 0.8
-        
-        # Combined score with weights
-        combined_score = (overlap_score * 0.6) + (substring_score * 0.3) + (containment_score * 0.1)
-        
-        return min(1.0, combined_score)  # Ensure score doesn't exceed 1.0
-        
     def _extract_service_info(self, time_entry):
         """
         Extract service information from a time entry, including fuzzy match details.
@@ -203,7 +201,7 @@ class ServicesMixin:
             Dict with service match information or None
         """
         # Check if this is Timeular API format
-        if 'tags' in time_entry and isinstance(time_entry['tags'], list) and time_entry['tags'] and isinstance(time_entry['tags'][0], dict):
+        if _is_timeular_api_entry(time_entry):
             # Process tags from Timeular API
             tag_labels = []
             for tag in time_entry['tags']:
@@ -212,7 +210,7 @@ class ServicesMixin:
                     
             # Try to match each tag
             for label in tag_labels:
-                service = self.find_service_by_tag(label)
+                service, match_score = self.find_service_by_tag(label, return_score=True)
                 if service:
                     # Check match type
                     if label.lower() in self.services["by_name"]:
@@ -220,7 +218,7 @@ class ServicesMixin:
                         score = 1.0
                     else:
                         match_type = "fuzzy"
-                        score = self._calculate_service_match_score(label, service)
+                        score = match_score
                         
                         # Return fuzzy match details
                         if match_type == "fuzzy" and score < 1.0:
@@ -236,45 +234,19 @@ class ServicesMixin:
             return None
             
         # Process CSV format
-        # Check different possible field names for tags
-        tag_fields = ['tags', 'tag', 'servicetag', 'service_tag', 'service']
-        
-        # Try to find tags in any of the fields
-        tags = None
-        tag_field_used = None
-        
-        for field in tag_fields:
-            if field in time_entry and time_entry[field]:
-                tags = time_entry[field]
-                tag_field_used = field
-                break
-        
-        if not tags:
+        # Use the first of the possible tag fields that has a value
+        tag_field_used = next((field for field in _TAG_FIELDS if time_entry.get(field)), None)
+        if tag_field_used is None:
             return None
         
-        # Process the tag(s)
-        tag_list = []
+        tags = time_entry[tag_field_used]
         
-        # If tags is a string, try to parse it as a list
-        if isinstance(tags, str):
-            # Common formats: comma-separated, semicolon-separated, or space-separated
-            if ',' in tags:
-                tag_list = [t.strip() for t in tags.split(',')]
-            elif ';' in tags:
-                tag_list = [t.strip() for t in tags.split(';')]
-            else:
-                # Assume space-separated or single tag
-                tag_list = [tags.strip()]
-        else:
-            # If it's already a list or other iterable
-            try:
-                tag_list = list(tags)
-            except:
-                tag_list = [str(tags)]
+        # Process the tag(s)
+        tag_list = _parse_tag_list(tags)
         
         # Try to match each tag to a service
         for tag in tag_list:
-            service = self.find_service_by_tag(tag)
+            service, match_score = self.find_service_by_tag(tag, return_score=True)
             
             if service:
                 # Determine if it was an exact or fuzzy match
@@ -284,7 +256,7 @@ class ServicesMixin:
                     score = 1.0
                 else:
                     match_type = "fuzzy"
-                    score = self._calculate_service_match_score(tag, service)
+                    score = match_score
                     
                     # Return fuzzy match information
                     if match_type == "fuzzy" and score < 1.0:
@@ -312,7 +284,7 @@ class ServicesMixin:
             Service ID if found and matched, None otherwise
         """
         # Check if this is Timeular API format (has tags array of objects)
-        if 'tags' in time_entry and isinstance(time_entry['tags'], list) and time_entry['tags'] and isinstance(time_entry['tags'][0], dict):
+        if _is_timeular_api_entry(time_entry):
             return self.extract_service_from_timeular_api(time_entry)
     
         # Otherwise assume CSV/Excel format
@@ -342,7 +314,7 @@ class ServicesMixin:
         for label in tag_labels:
             service_id = self.get_service_id_from_tag(label)
             if service_id:
-                logging.info(f"Matched Timeular tag '{label}' to service ID: {service_id}")
+                logging.info("Matched Timeular tag '%s' to service ID: %s", label, service_id)
                 return service_id
     
         return None
@@ -358,41 +330,18 @@ class ServicesMixin:
         Returns:
             Service ID if found, None otherwise
         """
-        # Check different possible field names for tags
-        tag_fields = ['tags', 'tag', 'servicetag', 'service_tag', 'service']
-    
-        # Try to find tags in any of the fields
-        tags = None
-        for field in tag_fields:
-            if field in time_entry and time_entry[field]:
-                tags = time_entry[field]
-                break
-    
-        if not tags:
+        # Use the first of the possible tag fields that has a value
+        tags = next((time_entry[field] for field in _TAG_FIELDS if time_entry.get(field)), None)
+        if tags is None:
             return None
     
-        # If tags is a string, try to parse it as a list
-        if isinstance(tags, str):
-            # Common formats: comma-separated, semicolon-separated, or space-separated
-            if ',' in tags:
-                tags_list = [t.strip() for t in tags.split(',')]
-            elif ';' in tags:
-                tags_list = [t.strip() for t in tags.split(';')]
-            else:
-                # Assume space-separated or single tag
-                tags_list = [tags.strip()]
-        else:
-            # If it's already a list or other iterable
-            try:
-                tags_list = list(tags)
-            except:
-                tags_list = [str(tags)]
+        tags_list = _parse_tag_list(tags)
     
         # Try to match each tag to a service
         for tag in tags_list:
             service_id = self.get_service_id_from_tag(tag)
             if service_id:
-                logging.info(f"Matched CSV tag '{tag}' to service ID: {service_id}")
+                logging.info("Matched CSV tag '%s' to service ID: %s", tag, service_id)
                 return service_id
     
         return None
@@ -416,15 +365,18 @@ class ServicesMixin:
         if not hasattr(self, 'services'):
             self.get_services()
         
-        # Prepare the data for CSV
-        mappings = []
+        fieldnames = ('timeular_tag', 'freshbooks_service_name', 'freshbooks_service_id',
+                      'billable', 'match_type', 'score')
+        
+        # Prepare the data for CSV as plain row tuples
+        rows = []
         for tag in tags:
             # Skip empty tags
             if not tag:
                 continue
                 
             # Try to find a matching service
-            service = self.find_service_by_tag(tag)
+            service, match_score = self.find_service_by_tag(tag, return_score=True)
             
             # Determine match type
             if service:
@@ -434,20 +386,21 @@ class ServicesMixin:
                     score = "1.0"
                 else:
                     match_type = "Fuzzy match"
-                    fuzzy_score = self._calculate_service_match_score(tag, service)
-                    score = f"{fuzzy_score:.2f}"
+                    score = f"{match_score:.2f}"
+                
+                rows.append((
+                    tag,
+                    service.get('name', ''),
+                    service.get('id', ''),
+                    service.get('billable', False),
+                    match_type,
+                    score
+                ))
             else:
-                match_type = "No match"
-                score = "0.0"
-            
-            mappings.append({
-                'timeular_tag': tag,
-                'freshbooks_service_name': service.get('name', '') if service else "No match",
-                'freshbooks_service_id': service.get('id', '') if service else "N/A",
-                'billable': service.get('billable', False) if service else "N/A",
-                'match_type': match_type,
-                'score': score
-            })
+                rows.append((tag, "No match", "N/A", "N/A", "No match", "0.0"))
+        
+        # Callers still get the mappings keyed by column name
+        mappings = [dict(zip(fieldnames, row)) for row in rows]
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -455,14 +408,10 @@ class ServicesMixin:
         
         # Write to CSV
         try:
-            with open(filename_with_timestamp, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['timeular_tag', 'freshbooks_service_name', 'freshbooks_service_id', 
-                             'billable', 'match_type', 'score']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for mapping in mappings:
-                    writer.writerow(mapping)
+            with open(filename_with_timestamp, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+                writer.writerows(rows)
             
             logging.info(f"Successfully exported service mappings to {filename_with_timestamp}")
             return filename_with_timestamp, mappings
@@ -2,6 +2,7 @@
 
 import os
 import json
+import argparse
 from datetime import datetime, timedelta
 import pytz
 from dotenv import load_dotenv
@@ -10,7 +11,7 @@ from freshbooks.client import FreshbooksClient
 from freshbooks.authentication import get_freshbooks_session
 from timeular.csv_handler import load_time_entries_from_excel
 
-def main():
+def main(refresh_clients=False):
     # Load environment variables
     load_dotenv()
     
@@ -43,8 +44,9 @@ def main():
     )
     
     # Step 3: Get clients from Freshbooks (needed for mapping Timeular activities to clients)
+    # (a list cached by an earlier run is reused unless refresh_clients is set)
     print("Fetching clients from Freshbooks...")
-    freshbooks_client.get_clients()
+    freshbooks_client.get_clients(refresh=refresh_clients)
     
     # Step 4: Authenticate with Timeular
     print("Authenticating with Timeular...")
@@ -82,7 +84,7 @@ def main():
             print(f"Retrieved {len(time_entries)} time entries from Timeular")
             
             # Save a summary report for reference
-            summary = timeular_client.generate_summary_report(start_date, end_date)
+            summary = timeular_client.generate_summary_report(start_date, end_date, formatted_entries=time_entries)
             with open("timeular_summary.json", "w") as f:
                 json.dump(summary, f, indent=2, default=str)
             print("Saved summary report to timeular_summary.json")
@@ -127,4 +129,8 @@ def main():
     print("\nTime entries have been uploaded to Freshbooks!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Upload Timeular time entries to Freshbooks")
+    parser.add_argument("--refresh-clients", action="store_true",
+                        help="Fetch the Freshbooks clients again instead of using the cached list")
+    args = parser.parse_args()
+    main(refresh_clients=args.refresh_clients)
\ No newline at end of file
@@ -1,18 +1,142 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import os
 import json
-from datetime import datetime, timedelta
-import pytz
+import time
+import base64
+import hashlib
+import logging
+import tempfile
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.fernet import Fernet, InvalidToken
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib decoder also accepts bytes
+    orjson = None
+    _json_loads = json.loads
+
+_UTC = timezone.utc
+
+# Sign-in tokens by API key hash, shared by every client in this process: key hash -> (token, expires_at)
+_TOKEN_CACHE = {}
+
+# Tokens this close to expiring are not reused
+_TOKEN_EXPIRY_MARGIN = 60  # Seconds
+
+
+def _get_token_expiry(token, default_ttl):
+    """Read the expiry time from a JWT token's exp claim, falling back to now + default_ttl."""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + default_ttl
+
+
+def _parse_timeular_timestamp(value):
+    """
+    Parse a Timeular UTC timestamp such as '2024-01-31T09:15:00.123', dropping the milliseconds.
+    
+    Args:
+        value: Timestamp string from the API, or None/empty
+    
+    Returns:
+        Timezone-aware UTC datetime, or None if there is no timestamp
+    """
+    if not value:
+        return None
+    # Timeular timestamps are UTC without an offset, so append it directly. fromisoformat is
+    # already a C parser; parsing the milliseconds and then dropping them with replace() is slower
+    return datetime.fromisoformat(value.split('.', 1)[0] + '+00:00')
+
+
+class TimeularAPIError(Exception):
+    """Raised when the Timeular API answers a request with anything but 200 OK."""
+
+
+def _check_response(response, action):
+    """
+    Raise TimeularAPIError unless the response is a 200 OK.
+    
+    Args:
+        response: requests Response to check
+        action: What the request was doing, used to start the error message
+    """
+    if response.status_code != 200:
+        logging.error("URL attempted: %s", response.url)
+        raise TimeularAPIError(f"{action}: {response.status_code} - {response.text}")
+
+
+def _round_half_hour(duration_hours):
+    """Rounds to the nearest half hour. 
+    If the duration is less than 15 minutes, it rounds up to 15 minutes, and anything
+    under half an hour rounds up to half an hour"""
+    if duration_hours < 0.5:
+        return 0.25 if duration_hours < 0.25 else 0.5
+    return round(duration_hours * 2) / 2
 
 class TimeularClient:
     BASE_URL = "https://api.timeular.com/api/v4"
     
+    # Sign-in tokens are also cached on disk (encrypted with the API secret) so later runs can
+    # skip the sign-in round-trip; set the directory to None to disable
+    token_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "timeular")
+    token_cache_ttl = 30 * 60  # Seconds, for tokens that don't carry their own expiry
+    
+    # How long get_activities reuses the activity list it fetched last
+    activities_cache_ttl = 5 * 60  # Seconds
+    
     def __init__(self, api_key, secret_key):
         self.api_key = api_key
         self.secret_key = secret_key
         self.token = None
         
-    def authenticate(self):
-        """Authenticate with the Timeular API and get an access token."""
+        # (activities, fetched_at) from the last get_activities call
+        self._activities_cache = None
+        
+        # Shared session so repeated API calls reuse pooled keep-alive connections
+        self.session = requests.Session()
+        # Rate limits (429) and transient server errors are retried here, honoring Retry-After.
+        # The POSTs (sign-in, reports) only read data, so they are safe to retry too
+        retries = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            respect_retry_after_header=True
+        )
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close the underlying HTTP session and its pooled connections."""
+        self.session.close()
+        
+    def authenticate(self, refresh=False):
+        """
+        Authenticate with the Timeular API and get an access token.
+        A still valid token from an earlier sign-in with the same API key is reused unless refresh=True.
+        
+        Args:
+            refresh: If True, always sign in again instead of reusing a cached token
+        """
+        cache_key = self._get_token_cache_key()
+        if not refresh:
+            token = self._load_cached_token(cache_key)
+            if token:
+                self._set_token(token)
+                return True
+        
         auth_url = f"{self.BASE_URL}/developer/sign-in"
         headers = {"Content-Type": "application/json"}
         payload = {
@@ -20,13 +144,129 @@ class TimeularClient:
             "apiSecret": self.secret_key
         }
         
-        response = requests.post(auth_url, json=payload, headers=headers)
+        response = self.session.post(auth_url, json=payload, headers=headers, timeout=30)
         
-        if response.status_code == 200:
-            self.token = response.json()["token"]
-            return True
-        else:
-            raise Exception(f"Authentication failed to Timeular: {response.status_code} - {response.text}")
+        _check_response(response, "Authentication failed to Timeular")
+        token = _json_loads(response.content)["token"]
+        self._set_token(token)
+        self._save_cached_token(cache_key, token, _get_token_expiry(token, self.token_cache_ttl))
+        return True
+    
+    def _set_token(self, token):
+        """Use token for this client's requests."""
+        self.token = token
+        # Later requests on the session carry the token without rebuilding headers
+        self.session.headers["Authorization"] = f"Bearer {token}"
+    
+    def _get_token_cache_key(self):
+        """Get the hash of the API key that cached tokens are stored under."""
+        return hashlib.sha256(self.api_key.encode()).hexdigest()
+    
+    def _get_token_fernet(self):
+        """Get the cipher protecting the on-disk token cache, keyed by the API secret."""
+        return Fernet(base64.urlsafe_b64encode(hashlib.sha256(self.secret_key.encode()).digest()))
+    
+    def _load_cached_token(self, cache_key):
+        """
+        Look up a sign-in token for this API key that is not about to expire.
+        
+        Args:
+            cache_key: Hash of the API key the token belongs to
+        
+        Returns:
+            The token, or None if there is no usable cached token
+        """
+        now = time.time()
+        cached = _TOKEN_CACHE.get(cache_key)
+        
+        if cached is None and self.token_cache_dir:
+            cache_path = os.path.join(self.token_cache_dir, f"{cache_key}.token")
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = tuple(json.loads(self._get_token_fernet().decrypt(f.read())))
+                _TOKEN_CACHE[cache_key] = cached
+            except (OSError, InvalidToken, ValueError, TypeError):
+                # Missing, unreadable or encrypted with another secret: sign in again
+                cached = None
+        
+        if cached is None:
+            return None
+        
+        token, expires_at = cached
+        if expires_at - now <= _TOKEN_EXPIRY_MARGIN:
+            _TOKEN_CACHE.pop(cache_key, None)
+            return None
+        return token
+    
+    def _save_cached_token(self, cache_key, token, expires_at):
+        """
+        Remember a sign-in token for this process and, if enabled, later runs.
+        
+        Args:
+            cache_key: Hash of the API key the token belongs to
+            token: Token returned by the sign-in endpoint
+            expires_at: Unix time the token expires at
+        """
+        _TOKEN_CACHE[cache_key] = (token, expires_at)
+        
+        if not self.token_cache_dir:
+            return
+        
+        cache_path = os.path.join(self.token_cache_dir, f"{cache_key}.token")
+        try:
+            os.makedirs(self.token_cache_dir, exist_ok=True)
+            
+            # Write to a temporary file first so readers never see a partial token
+            fd, temp_path = tempfile.mkstemp(dir=self.token_cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._get_token_fernet().encrypt(json.dumps([token, expires_at]).encode()))
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logging.warning("Could not write token cache %s: %s", cache_path, e)
+    
+    def _evict_cached_token(self, cache_key):
+        """
+        Forget the cached sign-in token for an API key, in this process and on disk.
+        
+        Args:
+            cache_key: Hash of the API key the token belongs to
+        """
+        _TOKEN_CACHE.pop(cache_key, None)
+        
+        if not self.token_cache_dir:
+            return
+        
+        try:
+            os.remove(os.path.join(self.token_cache_dir, f"{cache_key}.token"))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning("Could not remove token cache for %s: %s", cache_key, e)
+    
+    def _request(self, method, url, **kwargs):
+        """
+        Send an authenticated request to the Timeular API.
+        A cached token can be revoked or rotated before it expires, so if the request is
+        rejected as unauthorized the token is dropped, a new one is signed in for, and
+        the request is sent once more.
+        
+        Args:
+            method: HTTP method, e.g. "GET" or "POST"
+            url: Request URL
+            **kwargs: Passed on to requests.Session.request
+        
+        Returns:
+            The requests Response
+        """
+        response = self.session.request(method, url, headers=self.get_headers(), **kwargs)
+        
+        if response.status_code == 401:
+            logging.info("Timeular rejected the sign-in token, signing in again")
+            self._evict_cached_token(self._get_token_cache_key())
+            self.authenticate(refresh=True)
+            response = self.session.request(method, url, headers=self.get_headers(), **kwargs)
+        
+        return response
     
     def get_headers(self):
         """Get headers with authentication token."""
@@ -35,15 +275,26 @@ class TimeularClient:
         
         return {"Authorization": f"Bearer {self.token}"}
     
-    def get_activities(self):
-        """Get all activities from Timeular."""
+    def get_activities(self, refresh=False):
+        """
+        Get all activities from Timeular.
+        The list fetched within the last activities_cache_ttl seconds is reused unless refresh=True.
+        
+        Args:
+            refresh: If True, always fetch the activities from the API
+        """
+        if not refresh and self._activities_cache is not None:
+            activities, fetched_at = self._activities_cache
+            if time.monotonic() - fetched_at < self.activities_cache_ttl:
+                return activities
+        
         url = f"{self.BASE_URL}/activities"
-        response = requests.get(url, headers=self.get_headers())
+        response = self._request("GET", url, timeout=30)
         
-        if response.status_code == 200:
-            return response.json()["activities"]
-        else:
-            raise Exception(f"Failed to get activities: {response.status_code} - {response.text}")
+        _check_response(response, "Failed to get activities")
+        activities = _json_loads(response.content)["activities"]
+        self._activities_cache = (activities, time.monotonic())
+        return activities
     
     def get_time_entries(self, start_date=None, end_date=None):
         """
@@ -56,29 +307,79 @@ class TimeularClient:
         Returns:
             List of time entries
         """
-        # Default to last week if no dates provided
-        if not start_date:
-            start_date = datetime.now(pytz.UTC) - timedelta(days=7)
-        if not end_date:
-            end_date = datetime.now(pytz.UTC)
+        # Default to last week if no dates provided, both measured from the same moment
+        if not start_date or not end_date:
+            now = datetime.now(_UTC)
+            start_date = start_date or now - timedelta(days=7)
+            end_date = end_date or now
             
-        # Format dates for Timeular API (ISO 8601 format with timezone)
-        # Using the exact format Timeular expects: YYYY-MM-DDThh:mm:ss.SSS
+        # Format dates for Timeular API, using the exact format Timeular expects: YYYY-MM-DDThh:mm:ss.SSS
+        # (strftime also accepts plain dates, which format as midnight)
         start_iso = start_date.strftime("%Y-%m-%dT%H:%M:%S.987")
         end_iso = end_date.strftime("%Y-%m-%dT%H:%M:%S.987")
         
-        print(f"Fetching entries from {start_iso} to {end_iso}")
+        logging.debug("Fetching entries from %s to %s", start_iso, end_iso)
         
         url = f"{self.BASE_URL}/time-entries/{start_iso}/{end_iso}"
         
-        response = requests.get(url, headers=self.get_headers())
+        response = self._request("GET", url, timeout=30)
         
-        if response.status_code == 200:
-            return response.json()["timeEntries"]
-        else:
-            error_message = f"Failed to get time entries: {response.status_code} - {response.text}"
-            print(f"URL attempted: {url}")
-            raise Exception(error_message)
+        _check_response(response, "Failed to get time entries")
+        return _json_loads(response.content)["timeEntries"]
+    
+    def get_time_entries_many(self, ranges, max_workers=4):
+        """
+        Get time entries for several date ranges concurrently.
+        
+        Args:
+            ranges: Iterable of (start_date, end_date) tuples
+            max_workers: Maximum number of ranges fetched at the same time
+            
+        Returns:
+            List with the list of time entries for each range, in the order of ranges
+        """
+        ranges = list(ranges)
+        
+        # Sign in once up front so the workers don't all race to authenticate
+        self.get_headers()
+        
+        # Each range is an independent, network bound request over the shared session
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda date_range: self.get_time_entries(*date_range), ranges))
+    
+    def get_time_entries_batched(self, start_date, end_date, window=timedelta(days=30), max_workers=4):
+        """
+        Get time entries for a long date range by fetching it in windows concurrently.
+        
+        Args:
+            start_date: Start date
+            end_date: End date
+            window: Length of each window fetched with a single request
+            max_workers: Maximum number of windows fetched at the same time
+            
+        Returns:
+            List of time entries in window order, without duplicates
+        """
+        ranges = []
+        window_start = start_date
+        while window_start < end_date:
+            window_end = min(window_start + window, end_date)
+            ranges.append((window_start, window_end))
+            window_start = window_end
+        
+        # An entry crossing a window boundary is returned by both windows, so keep its first copy
+        entries = []
+        seen_ids = set()
+        for window_entries in self.get_time_entries_many(ranges, max_workers=max_workers):
+            for entry in window_entries:
+                entry_id = entry.get('id')
+                if entry_id is not None:
+                    if entry_id in seen_ids:
+                        continue
+                    seen_ids.add(entry_id)
+                entries.append(entry)
+        
+        return entries
     
     def get_last_week_entries(self):
         """
@@ -88,7 +389,7 @@ class TimeularClient:
             List of time entries formatted for easy use
         """
         # Calculate last week's date range
-        end_date = datetime.now(pytz.UTC)
+        end_date = datetime.now(_UTC)
         start_date = end_date - timedelta(days=7)
         
         # Get raw entries
@@ -105,25 +406,10 @@ class TimeularClient:
             activity_id = activity.get('id')
             activity_name = activity.get('name', 'Unknown Activity')
             
-            # Get duration information
+            # Get duration information and parse the timestamps to datetime objects
             duration = entry.get('duration', {})
-            start_time_str = duration.get('startedAt')
-            end_time_str = duration.get('stoppedAt')
-            
-            # Parse timestamps to datetime objects
-            if start_time_str:
-                # Remove milliseconds if present and handle timezone
-                start_time_str = start_time_str.split('.')[0] + 'Z'
-                start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-            else:
-                start_time = None
-                
-            if end_time_str:
-                # Remove milliseconds if present and handle timezone
-                end_time_str = end_time_str.split('.')[0] + 'Z'
-                end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-            else:
-                end_time = None
+            start_time = _parse_timeular_timestamp(duration.get('startedAt'))
+            end_time = _parse_timeular_timestamp(duration.get('stoppedAt'))
             
             # Calculate duration in hours
             if start_time and end_time:
@@ -137,15 +423,6 @@ class TimeularClient:
             
             # Get tags if present
             tags = note_obj.get('tags', [])
-            def rounding(duration_hours):
-                """Rounds up to the nearest half hour. 
-                If the duration is less than 15 minutes, it rounds up to 15 minutes"""
-                if duration_hours < 0.25:
-                    return 0.25
-                elif duration_hours < 0.5:
-                    return 0.5
-                else:
-                    return round(duration_hours * 2) / 2
             # Format the entry
             formatted_entry = {
                 "id": entry.get('id'),
@@ -153,7 +430,7 @@ class TimeularClient:
                 "activity_name": activity_name,
                 "start_time": start_time,
                 "end_time": end_time,
-                "duration_hours": rounding(duration_hours),
+                "duration_hours": _round_half_hour(duration_hours),
                 "note": note_text,
                 "tags": tags,
                 "is_ongoing": end_time is None
@@ -175,72 +452,45 @@ class TimeularClient:
         Returns:
             Report data in the requested format
         """
-        # Default to last week if no dates provided
-        if not start_date:
-            start_date = datetime.now(pytz.UTC) - timedelta(days=7)
-        if not end_date:
-            end_date = datetime.now(pytz.UTC)
+        # Default to last week if no dates provided, both measured from the same moment
+        if not start_date or not end_date:
+            now = datetime.now(_UTC)
+            start_date = start_date or now - timedelta(days=7)
+            end_date = end_date or now
             
         # Format dates as simple ISO dates for the reports endpoint
         start_date_str = start_date.strftime("%Y-%m-%d")
         end_date_str = end_date.strftime("%Y-%m-%d")
         
-        print(f"Generating report from {start_date_str} to {end_date_str}")
+        logging.info("Generating report from %s to %s", start_date_str, end_date_str)
         
+        format_type = format_type.lower()
+        if format_type not in ("json", "pdf", "csv", "xlsx"):
+            raise ValueError(f"Unsupported format: {format_type}. Use 'pdf', 'csv', 'xlsx', or 'json'")
+        
+        # Every format shares the same request; only the file type differs
         url = f"{self.BASE_URL}/report"
+        payload = {
+            "date": {
+                "start": start_date_str,
+                "end": end_date_str
+            },
+            'fileType': format_type,
+            "timezone": "UTC",
+            "userIds": [],  # Empty for current user
+            "showBillableTime": True,
+            "showTrackedTime": True
+        }
         
-        # Set up request parameters based on format type
-        if format_type.lower() == "json":
-            url = f"{self.BASE_URL}/report"
-            payload = {
-                "date": {
-                    "start": start_date_str,
-                    "end": end_date_str
-                },
-                'fileType': "json",
-                "timezone": "UTC",
-                "userIds": [],  # Empty for current user
-                "showBillableTime": True,
-                "showTrackedTime": True
-            }
-            
-            response = requests.post(url, json=payload, headers=self.get_headers())
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_message = f"Failed to generate report: {response.status_code} - {response.text}"
-                print(f"URL attempted: {url}")
-                raise Exception(error_message)
-                
-        else:
-            # For PDF, CSV, XLSX formats
-            format_type = format_type.lower()
-            if format_type not in ["pdf", "csv", "xlsx"]:
-                raise ValueError(f"Unsupported format: {format_type}. Use 'pdf', 'csv', 'xlsx', or 'json'")
-            
-            url = f"{self.BASE_URL}/report"
-            payload = {
-                "date": {
-                    "start": start_date_str,
-                    "end": end_date_str
-                },
-                'fileType': f"{format_type}",
-                "timezone": "UTC",
-                "userIds": [],
-                "showTrackedTime": True,
-                "showBillableTime": True
-            }
-            
-            response = requests.post(url, json=payload, headers=self.get_headers())
-            
-            if response.status_code == 200:
-                # For file downloads, return the binary content
-                return response.content
-            else:
-                error_message = f"Failed to generate {format_type} report: {response.status_code} - {response.text}"
-                print(f"URL attempted: {url}")
-                raise Exception(error_message)
+        response = self._request("POST", url, json=payload, timeout=120)
+        
+        if format_type == "json":
+            _check_response(response, "Failed to generate report")
+            return _json_loads(response.content)
+        
+        # For PDF, CSV, XLSX formats, return the binary content of the file download
+        _check_response(response, f"Failed to generate {format_type} report")
+        return response.content
 
     def generate_and_save_report(self, start_date=None, end_date=None, format_type="pdf", output_path=None):
         """
@@ -266,7 +516,10 @@ class TimeularClient:
                 output_path = f"timeular_report_{start_date.strftime('%Y-%m-%d')}_to_{end_date.strftime('%Y-%m-%d')}.{format_type.lower()}"
         
         # Save the report
-        if format_type.lower() == "json":
+        if format_type.lower() == "json" and orjson is not None:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(report_data, option=orjson.OPT_INDENT_2))
+        elif format_type.lower() == "json":
             with open(output_path, 'w') as f:
                 json.dump(report_data, f, indent=2)
         else:
@@ -274,53 +527,56 @@ class TimeularClient:
             with open(output_path, 'wb') as f:
                 f.write(report_data)
         
-        print(f"Report saved to: {output_path}")
+        logging.info("Report saved to: %s", output_path)
         return output_path
 
-    def generate_summary_report(self, start_date=None, end_date=None):
+    def generate_summary_report(self, start_date=None, end_date=None, formatted_entries=None):
         """
         Generate a summary report of time entries grouped by activity.
         
         Args:
             start_date: Start date (defaults to 7 days ago)
             end_date: End date (defaults to today)
+            formatted_entries: Optional output of format_entries for this period, so callers
+                that already have the entries don't pay for fetching and formatting them again
             
         Returns:
             Dictionary with summary information
         """
-        # Get formatted time entries for the period
-        if not start_date:
-            start_date = datetime.now(pytz.UTC) - timedelta(days=7)
-        if not end_date:
-            end_date = datetime.now(pytz.UTC)
+        # Get formatted time entries for the period, defaulting to the last week
+        if not start_date or not end_date:
+            now = datetime.now(_UTC)
+            start_date = start_date or now - timedelta(days=7)
+            end_date = end_date or now
             
-        entries = self.get_time_entries(start_date, end_date)
-        formatted_entries = self.format_entries(entries)
+        if formatted_entries is None:
+            entries = self.get_time_entries(start_date, end_date)
+            formatted_entries = self.format_entries(entries)
         
         # Group by activity
         activity_totals = {}
         daily_totals = {}
         
         for entry in formatted_entries:
-            activity = entry["activity_name"]
-            date_str = entry["start_time"].strftime("%Y-%m-%d") if entry["start_time"] else "No date"
+            hours = entry["duration_hours"]
+            start_time = entry["start_time"]
+            date_str = start_time.date().isoformat() if start_time else "No date"
             
-            # Add to activity totals
-            if activity not in activity_totals:
-                activity_totals[activity] = {
+            # Add to activity totals, looking the bucket up once per entry
+            totals = activity_totals.get(entry["activity_name"])
+            if totals is None:
+                totals = activity_totals[entry["activity_name"]] = {
                     "total_hours": 0,
                     "entry_count": 0,
                     "entries": []
                 }
             
-            activity_totals[activity]["total_hours"] += entry["duration_hours"]
-            activity_totals[activity]["entry_count"] += 1
-            activity_totals[activity]["entries"].append(entry)
+            totals["total_hours"] += hours
+            totals["entry_count"] += 1
+            totals["entries"].append(entry)
             
             # Add to daily totals
-            if date_str not in daily_totals:
-                daily_totals[date_str] = 0
-            daily_totals[date_str] += entry["duration_hours"]
+            daily_totals[date_str] = daily_totals.get(date_str, 0) + hours
         
         # Calculate grand total
         grand_total = sum(activity["total_hours"] for activity in activity_totals.values())
@@ -365,7 +621,7 @@ if __name__ == "__main__":
     #     client.authenticate()
     #     print("Authentication successful!")
     #     #get a report of last week:
-    #     report = client.generate_report(datetime.now(pytz.UTC) - timedelta(days=14), format_type='csv')
+    #     report = client.generate_report(datetime.now(_UTC) - timedelta(days=14), format_type='csv')
     #     print(report)
     #     # pretty_json = json.dumps(report, indent=4, cls=DateTimeEncoder)
     #     # print(pretty_json)
@@ -380,7 +636,8 @@ if __name__ == "__main__":
         # Get entries from last week
         print("\nFetching time entries from the last week...")
         # entries = client.get_last_week_entries()
-        entries = client.get_time_entries(datetime.now(pytz.UTC) - timedelta(days=30), datetime.now(pytz.UTC))
+        now = datetime.now(_UTC)
+        entries = client.get_time_entries(now - timedelta(days=30), now)
         entries = client.format_entries(entries)
         # Save Entries:
         with open("timeular_entries.json", "w") as f:
@@ -2,6 +2,20 @@ import pandas as pd
 from datetime import datetime, timedelta
 import json
 
+# Columns the loader reads; anything else in an export is never parsed or kept in memory
+_ENTRY_COLUMNS = ['TimeEntryID', 'StartDate', 'Duration', 'Billable', 'ActivityID',
+                  'Activity', 'FolderId', 'Folder', 'service', 'Note']
+
+def _parse_billable(billable_val):
+    """Interpret a Billable cell: booleans as-is, yes/true/y/1/billable strings, or any non-zero number."""
+    if isinstance(billable_val, bool):
+        return billable_val
+    elif isinstance(billable_val, str):
+        return billable_val.lower() in ['yes', 'true', 'y', '1', 'billable']
+    elif isinstance(billable_val, (int, float)):
+        return bool(billable_val)
+    return False
+
 def load_time_entries_from_excel(file_path):
     """
     Load time entries from an Excel/CSV file with specific fields:
@@ -18,50 +32,51 @@ def load_time_entries_from_excel(file_path):
     """
     # Detect file type and load
     if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
-        df = pd.read_excel(file_path)
+        df = pd.read_excel(file_path, usecols=_ENTRY_COLUMNS)
     elif file_path.endswith('.csv'):
-        df = pd.read_csv(file_path)
+        df = pd.read_csv(file_path, usecols=_ENTRY_COLUMNS)
     else:
         raise ValueError("Unsupported file format. Please use .xlsx, .xls, or .csv")
     
-    # Transform data to match Timeular format
+    # Transform data to match Timeular format, pulling each column out once
+    # instead of materializing a Series per row with iterrows
+    # (format='mixed' parses every cell on its own like the per-row conversion did, instead of
+    # inferring one format from the first row and rejecting rows written differently)
+    start_dates = pd.to_datetime(df['StartDate'], format='mixed').tolist()
+    durations = df['Duration'].astype('float64').tolist()  # Duration in seconds
+    
     time_entries = []
     
-    for _, row in df.iterrows():
-        # Parse start date
-        start_date = pd.to_datetime(row['StartDate'])
-        
-        # Parse duration (assuming it's in seconds)
-        duration_seconds = float(row['Duration'])
-        
+    for entry_id, activity_id, activity, start_date, duration_seconds, billable_val, note, folder_id, folder, service in zip(
+        df['TimeEntryID'].tolist(),
+        df['ActivityID'].tolist(),
+        df['Activity'].tolist(),
+        start_dates,
+        durations,
+        df['Billable'].tolist(),
+        df['Note'].tolist(),
+        df['FolderId'].tolist(),
+        df['Folder'].tolist(),
+        df['service'].tolist()
+    ):
         # Calculate end time
         end_date = start_date + timedelta(seconds=duration_seconds)
         
-        # Parse billable status
-        billable = False
-        billable_val = row['Billable']
-        if isinstance(billable_val, bool):
-            billable = billable_val
-        elif isinstance(billable_val, str):
-            billable = billable_val.lower() in ['yes', 'true', 'y', '1', 'billable']
-        elif isinstance(billable_val, (int, float)):
-            billable = bool(billable_val)
-        
         # Create entry object
         entry = {
-            'id': str(row['TimeEntryID']),
-            'activityId': str(row['ActivityID']),
-            'activityName': row['Activity'],
+            'id': str(entry_id),
+            'activityId': str(activity_id),
+            'activityName': activity,
             'startedAt': start_date.isoformat(),
             'stoppedAt': end_date.isoformat(),
             'duration': duration_seconds,  # Duration in seconds
-            'billable': billable,
-            'note': str(row['Note']) if not pd.isna(row['Note']) else "",
+            'billable': _parse_billable(billable_val),
+            'note': str(note) if not pd.isna(note) else "",
             'folder': {
-                'id': str(row['FolderId']),
-                'name': row['Folder']
+                'id': str(folder_id),
+                'name': folder
             },
-            'service': row['service'] if not pd.isna(row['service']) else ""
+            'service': service if not pd.isna(service) else ""
         }
         
         time_entries.append(entry)
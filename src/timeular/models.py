@@ -1,13 +1,16 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass(slots=True, frozen=True)
 class TimeEntry:
-    def __init__(self, id, description, start_time, end_time, user_id):
-        self.id = id
-        self.description = description
-        self.start_time = start_time
-        self.end_time = end_time
-        self.user_id = user_id
+    id: str
+    description: str
+    start_time: datetime
+    end_time: datetime
+    user_id: str
 
+@dataclass(slots=True, frozen=True)
 class User:
-    def __init__(self, id, name, email):
-        self.id = id
-        self.name = name
-        self.email = email
\ No newline at end of file
+    id: str
+    name: str
+    email: str
\ No newline at end of file
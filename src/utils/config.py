@@ -21,17 +21,17 @@ class Config:
     FRESHBOOKS_CLIENT_SECRET  = os.getenv("FRESHBOOKS_CLIENT_SECRET")
     FRESHBOOKS_USER_ID = os.getenv("FRESHBOOKS_USER_ID") # Optional
     
+    # Variables validate() requires; FRESHBOOKS_USER_ID is optional
+    REQUIRED_VARS = (
+        "TIMEULAR_API_KEY",
+        "TIMEULAR_API_SECRET",
+        "FRESHBOOKS_CLIENT_ID",
+        "FRESHBOOKS_CLIENT_SECRET",
+    )
+    
     @staticmethod
     def validate():
-        missing_vars = []
-        if not Config.TIMEULAR_API_KEY:
-            missing_vars.append("TIMEULAR_API_KEY")
-        if not Config.TIMEULAR_API_SECRET:
-            missing_vars.append("TIMEULAR_API_SECRET")
-        if not Config.FRESHBOOKS_CLIENT_ID:
-            missing_vars.append("FRESHBOOKS_CLIENT_ID")
-        if not Config.FRESHBOOKS_CLIENT_ID:
-            missing_vars.append("FRESHBOOKS_CLIENT_ID")
+        missing_vars = [name for name in Config.REQUIRED_VARS if not getattr(Config, name)]
         
         if missing_vars:
             raise ValueError(f"Missing environment variables: {', '.join(missing_vars)}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The packages live under src/ and are imported as top-level modules (as src/main.py does)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,126 @@
+import json
+import threading
+from unittest import mock
+
+import pytest
+import requests
+
+from freshbooks.client import FreshbooksClient
+from freshbooks.clients import ClientsMixin
+
+
+CLIENTS = [
+    {"id": 1, "fname": "Ada", "lname": "Lovelace", "organization": "Analytical Engines"},
+    {"id": 2, "fname": "Grace", "lname": "Hopper", "organization": "Compilers Inc"}
+]
+SERVICES = [
+    {"id": 10, "name": "Consulting"},
+    {"id": 11, "name": "Development"}
+]
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.content = json.dumps(payload or {}).encode()
+        self.text = self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+
+def fake_get(url, params=None, timeout=None):
+    if url.endswith("/users/clients"):
+        return FakeResponse(200, {"response": {"result": {"clients": CLIENTS, "page": 1, "pages": 1}}})
+    if url.endswith("/services"):
+        return FakeResponse(200, {"services": SERVICES})
+    return FakeResponse(404)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(ClientsMixin, "clients_cache_dir", None)
+    with mock.patch.object(requests.Session, "get", side_effect=fake_get):
+        with mock.patch.object(FreshbooksClient, "get_clients"), mock.patch.object(FreshbooksClient, "get_services"):
+            freshbooks = FreshbooksClient("token", business_id=1)
+        freshbooks.account_id = "abc"
+        freshbooks.get_clients()
+        freshbooks.get_services()
+    
+    freshbooks.dont_send = False
+    freshbooks.session.post = mock.Mock(return_value=FakeResponse(201, {"result": {"time_entry": {"id": 99}}}))
+    return freshbooks
+
+
+def make_entries():
+    return [
+        {"activity": "Analytical Engines", "duration": "1:30", "startdate": "2024-01-02", "service": "Consulting"},
+        {"activity": "Compilers Inc", "duration": "2", "startdate": "2024-01-03", "service": "Development"},
+        {"activity": "Compilers Inc", "duration": "0.5", "startdate": "2024-01-04", "service": "11"}
+    ]
+
+
+def test_batch_survives_failed_identity_lookup(client):
+    entries = make_entries()
+    
+    with mock.patch("freshbooks.client.requests.get", side_effect=requests.ConnectionError("offline")):
+        result = client.create_time_entries_batch(entries)
+    
+    assert result["stats"] == {"total": 3, "success": 0, "failure": 3}
+    assert [failure["entry"] for failure in result["failed"]] == entries
+    client.session.post.assert_not_called()
+
+
+def test_batch_entry_failing_resolution_fails_alone(client):
+    client.identity_id = 7
+    entries = make_entries()
+    get_client_id_from_name = client.get_client_id_from_name
+    
+    def flaky_lookup(name):
+        if name == "Analytical Engines":
+            raise ValueError("lookup failed")
+        return get_client_id_from_name(name)
+    
+    with mock.patch.object(client, "get_client_id_from_name", side_effect=flaky_lookup):
+        result = client.create_time_entries_batch(entries)
+    
+    assert result["stats"] == {"total": 3, "success": 2, "failure": 1}
+    assert result["failed"][0]["entry"] is entries[0]
+    assert client.session.post.call_count == 2
+
+
+def test_batch_sends_ids_resolved_on_the_calling_thread(client):
+    client.identity_id = 7
+    lookup_threads = set()
+    find_client_by_name = client.find_client_by_name
+    
+    def recording_lookup(*args, **kwargs):
+        lookup_threads.add(threading.current_thread())
+        return find_client_by_name(*args, **kwargs)
+    
+    with mock.patch.object(client, "find_client_by_name", side_effect=recording_lookup):
+        result = client.create_time_entries_batch(make_entries())
+    
+    assert result["stats"]["success"] == 3
+    assert lookup_threads == {threading.current_thread()}
+    
+    sent = sorted((call.kwargs["json"]["time_entry"] for call in client.session.post.call_args_list),
+                  key=lambda entry: entry["started_at"])
+    assert [(entry["client_id"], entry["service_id"]) for entry in sent] == [("1", "10"), ("2", "11"), ("2", "11")]
+    assert all(entry["identity_id"] == "7" for entry in sent)
+
+
+def test_time_entry_posts_retry_only_when_rate_limited():
+    with mock.patch.object(FreshbooksClient, "get_clients"), mock.patch.object(FreshbooksClient, "get_services"):
+        freshbooks = FreshbooksClient("token", business_id=1)
+    
+    retries = freshbooks.session.get_adapter(f"{freshbooks.base_url}/timetracking/business/1/time_entries").max_retries
+    
+    assert retries.is_retry("POST", 429)
+    assert not retries.is_retry("POST", 500)
+    assert not retries.is_retry("GET", 429)
+    assert retries.read is False
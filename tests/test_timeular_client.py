@@ -0,0 +1,109 @@
+import json
+import time
+from unittest import mock
+
+import pytest
+
+import timeular.client as timeular_client
+from timeular.client import TimeularClient, TimeularAPIError
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.content = json.dumps(payload or {}).encode()
+        self.text = self.content.decode()
+        self.url = "https://api.timeular.com/test"
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    timeular_client._TOKEN_CACHE.clear()
+    yield
+    timeular_client._TOKEN_CACHE.clear()
+
+
+def make_client(tmp_path, secret="secret", sign_in_tokens=("new-token",)):
+    """Create a client whose session signs in with the given tokens, in order."""
+    client = TimeularClient("api-key", secret)
+    client.token_cache_dir = str(tmp_path)
+    client.session = mock.Mock(headers={})
+    client.session.post.side_effect = [FakeResponse(200, {"token": token}) for token in sign_in_tokens]
+    return client
+
+
+def test_cached_token_is_reused_by_a_later_client(tmp_path):
+    first = make_client(tmp_path)
+    first.authenticate()
+    
+    # A new process has no in-memory cache, so the token must come from disk
+    timeular_client._TOKEN_CACHE.clear()
+    second = make_client(tmp_path)
+    second.authenticate()
+    
+    assert second.token == "new-token"
+    second.session.post.assert_not_called()
+
+
+def test_token_close_to_expiry_is_not_reused(tmp_path):
+    client = make_client(tmp_path)
+    cache_key = client._get_token_cache_key()
+    client._save_cached_token(cache_key, "old-token", time.time() + timeular_client._TOKEN_EXPIRY_MARGIN / 2)
+    
+    client.authenticate()
+    
+    assert client.token == "new-token"
+    client.session.post.assert_called_once()
+
+
+def test_token_cached_under_another_secret_is_ignored(tmp_path):
+    make_client(tmp_path, secret="old-secret").authenticate()
+    timeular_client._TOKEN_CACHE.clear()
+    
+    client = make_client(tmp_path, secret="new-secret", sign_in_tokens=("other-token",))
+    client.authenticate()
+    
+    assert client.token == "other-token"
+    client.session.post.assert_called_once()
+
+
+def test_evicted_token_is_gone_from_memory_and_disk(tmp_path):
+    client = make_client(tmp_path)
+    client.authenticate()
+    cache_key = client._get_token_cache_key()
+    
+    client._evict_cached_token(cache_key)
+    
+    assert cache_key not in timeular_client._TOKEN_CACHE
+    assert client._load_cached_token(cache_key) is None
+
+
+def test_rejected_token_signs_in_again_and_retries_once(tmp_path):
+    client = make_client(tmp_path, sign_in_tokens=("fresh-token",))
+    client._save_cached_token(client._get_token_cache_key(), "revoked-token", time.time() + 3600)
+    client.authenticate()
+    assert client.token == "revoked-token"
+    
+    client.session.request.side_effect = [
+        FakeResponse(401),
+        FakeResponse(200, {"activities": [{"id": "1"}]})
+    ]
+    
+    assert client.get_activities() == [{"id": "1"}]
+    
+    client.session.post.assert_called_once()
+    assert client.session.request.call_count == 2
+    assert client.session.request.call_args.kwargs["headers"] == {"Authorization": "Bearer fresh-token"}
+    assert timeular_client._TOKEN_CACHE[client._get_token_cache_key()][0] == "fresh-token"
+
+
+def test_second_rejection_raises_without_more_retries(tmp_path):
+    client = make_client(tmp_path, sign_in_tokens=("first-token", "second-token"))
+    client.authenticate()
+    client.session.request.return_value = FakeResponse(401)
+    
+    with pytest.raises(TimeularAPIError):
+        client.get_activities()
+    
+    assert client.session.request.call_count == 2
+    assert client.session.post.call_count == 2